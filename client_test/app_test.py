@@ -0,0 +1,64 @@
+# Copyright Modal Labs 2023
+import asyncio
+import pytest
+
+import modal.app
+from modal.app import _App
+from modal.client import _Client
+from modal.object import Handle
+from modal.queue import _Queue
+from modal_proto import api_pb2
+
+
+def _queue(load):
+    return _Queue._from_loader(load, "Queue()")
+
+
+@pytest.mark.asyncio
+async def test_create_all_objects_reuses_existing_dependency_ids(servicer, monkeypatch):
+    # Same as having more tagged objects than can be loaded at once
+    monkeypatch.setattr(modal.app, "MAX_CONCURRENT_OBJECT_LOADS", 1)
+    async with _Client(servicer.remote_addr, api_pb2.CLIENT_TYPE_CLIENT, ("foo-id", "foo-secret")) as client:
+
+        async def load_dependency(resolver):
+            return Handle._from_id(resolver.existing_object_id or "qu-new", resolver.client, None)
+
+        dependency = _queue(load_dependency)
+
+        async def load_dependent(resolver):
+            await resolver.load(dependency)
+            return Handle._from_id(resolver.existing_object_id or "qu-new", resolver.client, None)
+
+        # The dependent object is loaded first, and creates its dependency through the resolver
+        blueprint = {"dependent": _queue(load_dependent), "dependency": dependency}
+        tag_to_existing_id = {"dependent": "qu-dependent", "dependency": "qu-dependency"}
+        app = _App(client, "ap-123", "", tag_to_existing_id=tag_to_existing_id)
+        tag_to_object = await app._create_all_objects(blueprint, None, api_pb2.APP_STATE_DEPLOYED)
+
+        assert {tag: obj.object_id for tag, obj in tag_to_object.items()} == tag_to_existing_id
+
+
+@pytest.mark.asyncio
+async def test_create_all_objects_cancels_loads_on_failure(servicer):
+    async with _Client(servicer.remote_addr, api_pb2.CLIENT_TYPE_CLIENT, ("foo-id", "foo-secret")) as client:
+        slow_load_cancelled = False
+
+        async def load_slow(resolver):
+            nonlocal slow_load_cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                slow_load_cancelled = True
+                raise
+
+        async def load_failing(resolver):
+            await asyncio.sleep(0.01)
+            raise ValueError("Failed creating object")
+
+        blueprint = {"slow": _queue(load_slow), "failing": _queue(load_failing)}
+        app = _App(client, "ap-123", "")
+        with pytest.raises(ValueError):
+            await app._create_all_objects(blueprint, None, api_pb2.APP_STATE_EPHEMERAL)
+
+        assert slow_load_cancelled
+        assert not app._local_uuid_to_pending_load
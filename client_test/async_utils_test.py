@@ -4,6 +4,7 @@ import logging
 import os
 import platform
 import pytest
+import time
 
 from synchronicity import Interface, Synchronizer
 
@@ -56,6 +57,38 @@ async def test_retry():
         assert await f_retry(42) == 43
 
 
+@pytest.mark.asyncio
+async def test_retry_exceptions():
+    f = FailNTimes(1, exc=TypeError())
+    f_retry = retry(retry_exceptions=(SampleException,))(f)
+    with pytest.raises(TypeError):
+        await f_retry(42)
+    assert f.n_calls == 1
+
+    f_retry = retry(retry_exceptions=(SampleException,))(FailNTimes(2))
+    assert await f_retry(42) == 43
+
+
+@pytest.mark.asyncio
+async def test_retry_delay(monkeypatch):
+    delays = []
+
+    async def mock_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(async_utils, "_retry_sleep", mock_sleep)
+
+    f_retry = retry(n_attempts=5, base_delay=1, max_delay=3, jitter=0)(FailNTimes(4))
+    assert await f_retry(42) == 43
+    assert delays == [1, 2, 3, 3]
+
+    delays.clear()
+    f_retry = retry(n_attempts=5, base_delay=1, max_delay=3, jitter=0.5)(FailNTimes(4))
+    assert await f_retry(42) == 43
+    for delay, expected in zip(delays, [1, 2, 3, 3]):
+        assert 0.5 * expected <= delay <= 1.5 * expected
+
+
 @pytest.mark.asyncio
 async def test_task_context():
     async with TaskContext() as task_context:
@@ -78,6 +111,57 @@ async def test_task_context_grace():
     assert v.cancelled()
 
 
+@pytest.mark.asyncio
+async def test_task_context_reaps_cancelled_tasks():
+    cleaned_up = False
+
+    async def f():
+        nonlocal cleaned_up
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned_up = True
+
+    async with TaskContext(grace=0.1) as task_context:
+        t = task_context.create_task(f())
+    # The task has been cancelled and has exited by the time the context is left
+    assert t.cancelled()
+    assert cleaned_up
+
+
+@pytest.mark.asyncio
+async def test_task_context_grace_cancels_loops():
+    async def f():
+        await asyncio.sleep(10)
+
+    async with TaskContext(grace=0.1) as task_context:
+        t = task_context.infinite_loop(f)
+        await asyncio.sleep(0.01)
+    assert t.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_task_context_ignored_cancellation(monkeypatch):
+    monkeypatch.setattr(async_utils, "CANCELLATION_TIMEOUT", 0.1)
+
+    async def f():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            pass  # Ignore the first cancellation
+        await asyncio.sleep(10)
+
+    t0 = time.monotonic()
+    async with TaskContext(grace=0.1) as task_context:
+        t = task_context.create_task(f())
+    # Doesn't wait forever for a task that doesn't exit
+    assert time.monotonic() - t0 < 1.0
+    assert not t.done()
+    t.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await t
+
+
 async def raise_exception():
     raise SampleException("foo")
 
@@ -154,6 +238,18 @@ async def test_queue_batch_iterator():
         assert len(drained_items) == 3
 
 
+@pytest.mark.asyncio
+async def test_queue_batch_iterator_max_batch_size():
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(250):
+        queue.put_nowait(i)
+    queue.put_nowait(None)
+
+    batches = [batch async for batch in queue_batch_iterator(queue, max_batch_size=100)]
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    assert sum(batches, []) == list(range(250))
+
+
 @pytest.mark.asyncio
 async def test_warn_if_generator_is_not_consumed(caplog):
     @warn_if_generator_is_not_consumed
@@ -1,7 +1,8 @@
 # Copyright Modal Labs 2022
 import pytest
+import time
 
-from modal._blob_utils import blob_download, blob_upload
+from modal._blob_utils import TransientHTTPError, blob_download, blob_upload
 from modal.exception import ExecutionError
 from modal_utils.async_utils import synchronize_apis
 
@@ -27,10 +28,20 @@ async def test_blob_put_failure(servicer, blob_server, aio_client):
 
 @pytest.mark.asyncio
 async def test_blob_get_failure(servicer, blob_server, aio_client):
-    with pytest.raises(ExecutionError):
+    with pytest.raises(TransientHTTPError):
         await aio_blob_download("bl-failure", aio_client.stub)
 
 
+@pytest.mark.asyncio
+async def test_blob_get_not_found(servicer, blob_server, aio_client):
+    # Client errors aren't retried
+    t0 = time.monotonic()
+    with pytest.raises(ExecutionError) as excinfo:
+        await aio_blob_download("bl-missing", aio_client.stub)
+    assert not isinstance(excinfo.value, TransientHTTPError)
+    assert time.monotonic() - t0 < 0.5
+
+
 @pytest.mark.asyncio
 async def test_blob_large(servicer, blob_server, aio_client):
     data = b"*" * 10_000_000
@@ -1,6 +1,6 @@
 # Copyright Modal Labs 2022
-import os
 import pytest
+import shutil
 import sys
 import traceback
 import unittest.mock
@@ -28,6 +28,12 @@ assert mod.stub == stub
 
 dummy_other_module_file = "x = 42"
 
+dummy_aio_app_file = """
+from modal.aio import AioStub
+
+stub = AioStub("my_aio_app")
+"""
+
 
 @pytest_asyncio.fixture
 async def set_env_client(aio_client):
@@ -38,47 +44,57 @@ async def set_env_client(aio_client):
         Client.set_env_client(None)
 
 
+@pytest.fixture(scope="session")
+def deploy_template_dir(tmp_path_factory):
+    template_dir = tmp_path_factory.mktemp("deploy_template")
+    (template_dir / "myapp.py").write_text(dummy_app_file)
+    (template_dir / "other_module.py").write_text(dummy_other_module_file)
+    (template_dir / "myaioapp.py").write_text(dummy_aio_app_file)
+    return template_dir
+
+
+@pytest.fixture
+def deploy_dir(deploy_template_dir, tmp_path, monkeypatch):
+    # Copy the template rather than writing out the files for every test.
+    # Imported app modules are cleaned up by the reset_sys_modules fixture.
+    work_dir = tmp_path / "work"
+    shutil.copytree(deploy_template_dir, work_dir)
+    monkeypatch.chdir(work_dir)
+    return work_dir
+
+
+runner = click.testing.CliRunner()
+
+
 def _run(args, expected_exit_code=0):
-    runner = click.testing.CliRunner()
     res = runner.invoke(entrypoint_cli, args)
     if res.exit_code != expected_exit_code:
         print("stdout:", repr(res.stdout))
-        traceback.print_tb(res.exc_info[2])
-        assert res.exit_code == expected_exit_code
+        if res.exc_info is not None:
+            print("".join(traceback.format_exception(*res.exc_info)))
+        pytest.fail(f"Exit code {res.exit_code} != {expected_exit_code}")
     return res
 
 
-def test_app_deploy_success(servicer, mock_dir, set_env_client):
-    with mock_dir({"myapp.py": dummy_app_file, "other_module.py": dummy_other_module_file}):
-        # Deploy as a script in cwd
-        _run(["deploy", "myapp.py"])
-
-        # Deploy as a module
-        _run(["deploy", "myapp"])
-
-        # Deploy as a script with an absolute path
-        _run(["deploy", os.path.abspath("myapp.py")])
+@pytest.mark.parametrize(
+    "deploy_target",
+    ["myapp.py", "myapp", "{deploy_dir}/myapp.py"],
+    ids=["script_in_cwd", "module", "script_absolute_path"],
+)
+def test_app_deploy_success(servicer, deploy_dir, set_env_client, deploy_target):
+    _run(["deploy", deploy_target.format(deploy_dir=deploy_dir)])
 
     assert "my_app" in servicer.deployed_apps
 
 
-def test_app_deploy_with_name(servicer, mock_dir, set_env_client):
-    with mock_dir({"myapp.py": dummy_app_file, "other_module.py": dummy_other_module_file}):
-        _run(["deploy", "myapp.py", "--name", "my_app_foo"])
+def test_app_deploy_with_name(servicer, deploy_dir, set_env_client):
+    _run(["deploy", "myapp.py", "--name", "my_app_foo"])
 
     assert "my_app_foo" in servicer.deployed_apps
 
 
-dummy_aio_app_file = """
-from modal.aio import AioStub
-
-stub = AioStub("my_aio_app")
-"""
-
-
-def test_aio_app_deploy_success(servicer, mock_dir, set_env_client):
-    with mock_dir({"myaioapp.py": dummy_aio_app_file}):
-        _run(["deploy", "myaioapp.py"])
+def test_aio_app_deploy_success(servicer, deploy_dir, set_env_client):
+    _run(["deploy", "myaioapp.py"])
 
     assert "my_aio_app" in servicer.deployed_apps
 
@@ -93,9 +109,9 @@ def test_secret_list(servicer, set_env_client):
     assert "dummy-secret-0" not in res.stdout
     servicer.created_secrets = 2
 
-    res = _run(["secret", "list"])
-    assert "dummy-secret-0" in res.stdout
-    assert "dummy-secret-1" in res.stdout
+    stdout = _run(["secret", "list"]).stdout
+    assert "dummy-secret-0" in stdout
+    assert "dummy-secret-1" in stdout
 
 
 def test_secret_create(servicer, set_env_client):
@@ -111,60 +127,67 @@ def test_app_token_new(servicer, server_url_env):
         _run(["token", "new", "--env", "_test"])
 
 
-def test_run(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "default_stub.py"
-    _run(["run", stub_file.as_posix()])
+@pytest.fixture(scope="module")
+def app_run_tests_dir(test_dir):
+    return test_dir / "supports" / "app_run_tests"
+
 
+@pytest.fixture(scope="module")
+def default_stub_file(app_run_tests_dir):
+    return (app_run_tests_dir / "default_stub.py").as_posix()
 
-def test_help_message_unspecified_function(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "stub_with_multiple_functions.py"
-    result = _run(["run", stub_file.as_posix()], expected_exit_code=2)
+
+def test_run(servicer, server_url_env, default_stub_file):
+    _run(["run", default_stub_file])
+
+
+def test_help_message_unspecified_function(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "stub_with_multiple_functions.py"
+    stdout = _run(["run", stub_file.as_posix()], expected_exit_code=2).stdout
 
     # should suggest available functions on the stub:
-    assert "foo" in result.stdout
-    assert "bar" in result.stdout
+    assert "foo" in stdout
+    assert "bar" in stdout
 
-    result = _run(
+    stdout = _run(
         ["run", stub_file.as_posix(), "--help"], expected_exit_code=2
-    )  # TODO: help should not return non-zero
+    ).stdout  # TODO: help should not return non-zero
     # help should also available functions on the stub:
-    assert "foo" in result.stdout
-    assert "bar" in result.stdout
+    assert "foo" in stdout
+    assert "bar" in stdout
 
 
-def test_help_message_when_using_function_as_stub(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "stub_with_multiple_functions.py"
+def test_help_message_when_using_function_as_stub(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "stub_with_multiple_functions.py"
     result = _run(["run", stub_file.as_posix() + "::foo"], expected_exit_code=1)
     assert "Expected to find a stub variable named foo" in result.stdout
 
 
-def test_run_detach(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "default_stub.py"
-    _run(["run", "--detach", stub_file.as_posix()])
+def test_run_detach(servicer, server_url_env, default_stub_file):
+    _run(["run", "--detach", default_stub_file])
     assert servicer.app_state == {"ap-1": api_pb2.APP_STATE_DETACHED}
 
 
-def test_deploy(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "default_stub.py"
-    _run(["deploy", "--name=deployment_name", stub_file.as_posix()])
+def test_deploy(servicer, server_url_env, default_stub_file):
+    _run(["deploy", "--name=deployment_name", default_stub_file])
     assert servicer.app_state == {"ap-1": api_pb2.APP_STATE_DEPLOYED}
 
 
-def test_run_custom_stub(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "custom_stub.py"
+def test_run_custom_stub(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "custom_stub.py"
     res = _run(["run", stub_file.as_posix(), "foo"], expected_exit_code=1)
     assert "stub variable" in res.stdout  # error output
     _run(["run", stub_file.as_posix() + "::my_stub.foo"])
 
 
-def test_run_aiostub(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "async_stub.py"
+def test_run_aiostub(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "async_stub.py"
     _run(["run", stub_file.as_posix()])
     assert len(servicer.client_calls) == 1
 
 
-def test_run_local_entrypoint(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "local_entrypoint.py"
+def test_run_local_entrypoint(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "local_entrypoint.py"
 
     res = _run(["run", stub_file.as_posix() + "::stub.main"])  # explicit name
     assert "called locally" in res.stdout
@@ -175,57 +198,54 @@ def test_run_local_entrypoint(servicer, server_url_env, test_dir):
     assert len(servicer.client_calls) == 4
 
 
-def test_run_parse_args(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "cli_args.py"
-    res = _run(["run", stub_file.as_posix()], expected_exit_code=2)
+@pytest.fixture(scope="module")
+def cli_args_stub_file(app_run_tests_dir):
+    return (app_run_tests_dir / "cli_args.py").as_posix()
+
+
+def test_run_parse_args_no_entrypoint(servicer, server_url_env, cli_args_stub_file):
+    res = _run(["run", cli_args_stub_file], expected_exit_code=2)
     assert "You need to specify an entrypoint" in res.stdout
 
-    valid_call_args = [
-        (
-            [
-                "run",
-                f"{stub_file.as_posix()}::stub.dt_arg",
-                "--dt",
-                "2022-10-31",
-            ],
-            "the day is 31",
-        ),
-        (["run", f"{stub_file.as_posix()}::.dt_arg", "--dt=2022-10-31"], "the day is 31"),
-        (["run", f"{stub_file.as_posix()}::.int_arg", "--i=200"], "200"),
-        (["run", f"{stub_file.as_posix()}::.default_arg"], "10"),
-        (["run", f"{stub_file.as_posix()}::.unannotated_arg", "--i=2022-10-31"], "'2022-10-31'"),
+
+@pytest.mark.parametrize(
+    "entrypoint,args,expected",
+    [
+        ("stub.dt_arg", ["--dt", "2022-10-31"], "the day is 31"),
+        (".dt_arg", ["--dt=2022-10-31"], "the day is 31"),
+        (".int_arg", ["--i=200"], "200"),
+        (".default_arg", [], "10"),
+        (".unannotated_arg", ["--i=2022-10-31"], "'2022-10-31'"),
         # TODO: fix class references
-        # (["run", f"{stub_file.as_posix()}::.ALifecycle.some_method", "--i=hello"], "'hello'")
-    ]
-    for args, expected in valid_call_args:
-        res = _run(args)
-        assert expected in res.stdout
-        assert len(servicer.client_calls) == 0
+        # (".ALifecycle.some_method", ["--i=hello"], "'hello'"),
+    ],
+)
+def test_run_parse_args(servicer, server_url_env, cli_args_stub_file, entrypoint, args, expected):
+    res = _run(["run", f"{cli_args_stub_file}::{entrypoint}", *args])
+    assert expected in res.stdout
+    assert len(servicer.client_calls) == 0
+
+
+main_thread_assertion_module_name = "client_test.supports.app_run_tests.main_thread_assertion"
 
 
 @pytest.fixture
-def fresh_main_thread_assertion_module(test_dir):
-    modules_to_unload = [n for n in sys.modules.keys() if "main_thread_assertion" in n]
-    assert len(modules_to_unload) <= 1
-    for mod in modules_to_unload:
-        sys.modules.pop(mod)
-    yield test_dir / "supports" / "app_run_tests" / "main_thread_assertion.py"
+def fresh_main_thread_assertion_module(app_run_tests_dir):
+    # The module is registered under its package-qualified name when imported from a file path
+    sys.modules.pop(main_thread_assertion_module_name, None)
+    yield app_run_tests_dir / "main_thread_assertion.py"
 
 
-def test_no_user_code_in_synchronicity_run(servicer, server_url_env, test_dir, fresh_main_thread_assertion_module):
-    pytest._did_load_main_thread_assertion = False
+def test_no_user_code_in_synchronicity_run(servicer, server_url_env, fresh_main_thread_assertion_module):
     _run(["run", fresh_main_thread_assertion_module.as_posix()])
-    assert pytest._did_load_main_thread_assertion
-    print()
+    assert main_thread_assertion_module_name in sys.modules  # make sure the module was loaded at all
 
 
-def test_no_user_code_in_synchronicity_deploy(servicer, server_url_env, test_dir, fresh_main_thread_assertion_module):
-    pytest._did_load_main_thread_assertion = False
+def test_no_user_code_in_synchronicity_deploy(servicer, server_url_env, fresh_main_thread_assertion_module):
     _run(["deploy", "--name", "foo", fresh_main_thread_assertion_module.as_posix()])
-    assert pytest._did_load_main_thread_assertion
-    print()
+    assert main_thread_assertion_module_name in sys.modules  # make sure the module was loaded at all
 
 
-def test_serve(servicer, server_url_env, test_dir):
-    stub_file = test_dir / "supports" / "app_run_tests" / "webhook.py"
+def test_serve(servicer, server_url_env, app_run_tests_dir):
+    stub_file = app_run_tests_dir / "webhook.py"
     _run(["serve", stub_file.as_posix(), "--timeout", "3"])
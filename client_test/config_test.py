@@ -1,33 +1,37 @@
 # Copyright Modal Labs 2022
+import importlib
+import json
 import os
-import pathlib
-import subprocess
-import sys
-import tempfile
-
-import modal
-
-
-def _cli(args, env={}):
-    lib_dir = pathlib.Path(modal.__file__).parent.parent
-    args = [sys.executable, "-m", "modal.cli.entry_point"] + args
-    env = {
-        **os.environ,
-        **env,
-        # For windows
-        "PYTHONUTF8": "1",
-    }
-    ret = subprocess.run(args, cwd=lib_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout = ret.stdout.decode()
-    stderr = ret.stderr.decode()
-    if ret.returncode != 0:
-        raise Exception(f"Failed with {ret.returncode} stdout: {stdout} stderr: {stderr}")
-    return stdout
+import pytest
+import unittest.mock
+
+import click.testing
+
+import modal.config
+from modal.cli.entry_point import entrypoint_cli
+
+runner = click.testing.CliRunner()
+
 
+def _cli(args, env=None):
+    # modal.config reads the environment and the .toml file at import time, so it's reloaded
+    # to pick up the overrides, and reloaded again afterwards to restore the original state.
+    # Rich tracebacks are left alone since they would be installed in the test process itself.
+    with unittest.mock.patch("modal._traceback.setup_rich_traceback"):
+        try:
+            with unittest.mock.patch.dict(os.environ, env or {}):
+                importlib.reload(modal.config)
+                res = runner.invoke(entrypoint_cli, args, catch_exceptions=False)
+        finally:
+            importlib.reload(modal.config)
+    if res.exit_code != 0:
+        raise Exception(f"Failed with {res.exit_code} stdout: {res.stdout}")
+    return res.stdout
 
-def _get_config(env={}):
+
+def _get_config(env=None):
     stdout = _cli(["config", "show"], env=env)
-    return eval(stdout)
+    return json.loads(stdout)
 
 
 def test_config():
@@ -40,16 +44,17 @@ def test_config_env_override():
     assert config["server_url"] == "xyz.corp"
 
 
-def test_config_store_user(servicer):
-    # Can't reopen a TemporaryFile on windows if it's already open.
-    t = tempfile.NamedTemporaryFile(delete=False)
-    t.close()
-
-    env = {
-        "MODAL_CONFIG_PATH": t.name,
+@pytest.fixture
+def user_config_env(servicer, tmp_path):
+    return {
+        "MODAL_CONFIG_PATH": str(tmp_path / ".modal.toml"),
         "MODAL_SERVER_URL": servicer.remote_addr,
     }
 
+
+def test_config_store_user(user_config_env):
+    env = user_config_env
+
     # No token by default
     config = _get_config(env=env)
     assert config["token_id"] is None
@@ -82,5 +87,3 @@ def test_config_store_user(servicer):
     config = _get_config(env={"MODAL_ENV": "prof_2", **env})
     assert config["token_id"] == "foo"
     assert config["token_secret"] == "bar2"
-
-    os.remove(t.name)
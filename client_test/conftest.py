@@ -13,6 +13,7 @@ import pytest
 import shutil
 import sys
 import tempfile
+import time
 import traceback
 from pathlib import Path
 
@@ -41,17 +42,24 @@ class MockClientServicer(api_grpc.ModalClientBase):
     # TODO(erikbern): add more annotations
     container_inputs: list[api_pb2.FunctionGetInputsResponse]
     container_outputs: list[api_pb2.FunctionPutOutputsRequest]
+    container_get_inputs_times: list[float]
 
     def __init__(self, blob_host, blobs):
-        self.app_state = {}
-        self.n_blobs = 0
         self.blob_host = blob_host
         self.blobs = blobs  # shared dict
+        self.reset()
+
+    def reset(self):
+        """Restore the initial state, so the same servicer can be reused across tests"""
+        self.app_state = {}
+        self.n_blobs = 0
+        self.blobs.clear()
         self.requests = []
         self.done = False
         self.rate_limit_sleep_duration = None
         self.fail_get_inputs = False
         self.container_inputs = []
+        self.container_get_inputs_times = []
         self.container_outputs = []
         self.queue = []
         self.deployed_apps = {
@@ -273,6 +281,7 @@ class MockClientServicer(api_grpc.ModalClientBase):
     async def FunctionGetInputs(self, stream):
         request: api_pb2.FunctionGetInputsRequest = await stream.recv_message()
         assert request.function_id
+        self.container_get_inputs_times.append(time.time())
         if self.fail_get_inputs:
             raise GRPCError(Status.INTERNAL)
         elif self.rate_limit_sleep_duration is not None:
@@ -485,7 +494,15 @@ class MockClientServicer(api_grpc.ModalClientBase):
         )
 
 
-@pytest_asyncio.fixture
+@pytest.fixture(scope="session")
+def event_loop():
+    # Session-scoped so that the servicer and blob server can be shared across tests
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
 async def blob_server():
     blobs = {}
     blob_parts: Dict[str, Dict[int, bytes]] = defaultdict(dict)
@@ -506,16 +523,17 @@ async def blob_server():
 
     async def complete_multipart(request):
         blob_id = request.query["blob_id"]
-        blob_nums = range(min(blob_parts[blob_id].keys()), max(blob_parts[blob_id].keys()) + 1)
+        parts = blob_parts.pop(blob_id)  # blob ids are reused across tests
+        blob_nums = range(min(parts.keys()), max(parts.keys()) + 1)
         content = b""
         part_hashes = b""
         for num in blob_nums:
-            part_content = blob_parts[blob_id][num]
+            part_content = parts[num]
             content += part_content
             part_hashes += hashlib.md5(part_content).digest()
 
         content_md5 = hashlib.md5(part_hashes).hexdigest()
-        etag = f'"{content_md5}-{len(blob_parts[blob_id])}"'
+        etag = f'"{content_md5}-{len(parts)}"'
         blobs[blob_id] = content
         return aiohttp.web.Response(text=f"<etag>{etag}</etag>")
 
@@ -523,6 +541,8 @@ async def blob_server():
         blob_id = request.query["blob_id"]
         if blob_id == "bl-failure":
             return aiohttp.web.Response(status=500)
+        elif blob_id not in blobs:
+            return aiohttp.web.Response(status=404)
         return aiohttp.web.Response(body=blobs[blob_id])
 
     app = aiohttp.web.Application()
@@ -534,7 +554,7 @@ async def blob_server():
         yield host, blobs
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest_asyncio.fixture(scope="session")
 async def servicer_factory(blob_server):
     @contextlib.asynccontextmanager
     async def create_server(host=None, port=None, path=None):
@@ -563,14 +583,21 @@ async def servicer_factory(blob_server):
     yield create_server
 
 
-@pytest_asyncio.fixture(scope="function")
-async def servicer(servicer_factory):
+@pytest_asyncio.fixture(scope="session")
+async def session_servicer(servicer_factory):
     port = find_free_port()
     async with servicer_factory(host="0.0.0.0", port=port) as servicer:
         servicer.remote_addr = f"http://localhost:{port}"
         yield servicer
 
 
+@pytest.fixture(scope="function")
+def servicer(session_servicer):
+    # Binding a new gRPC server per test is slow, so reuse the session one and just reset its state
+    session_servicer.reset()
+    yield session_servicer
+
+
 @pytest_asyncio.fixture(scope="function")
 async def unix_servicer(servicer_factory):
     with tempfile.TemporaryDirectory() as tmpdirname:
@@ -1,13 +1,19 @@
 # Copyright Modal Labs 2022
 from __future__ import annotations
+import asyncio
+import functools
 import json
 import pytest
 import sys
 import time
 
+from grpclib import Status
 from grpclib.exceptions import GRPCError
 
+import modal.app
+import modal.dict
 from modal._container_entrypoint import UserException, main
+from modal._object_meta import ObjectMeta
 
 # from modal_test_support import SLEEP_DELAY
 from modal._serialization import deserialize, serialize
@@ -141,6 +147,7 @@ def test_generator_failure(unix_servicer, event_loop):
         assert deserialize(result.data, client) == i**2
         assert items[i].gen_index == i
 
+    assert items[-1].gen_index == 5
     last_result = items[-1].result
     assert last_result.status == api_pb2.GenericResult.GENERIC_STATUS_FAILURE
     assert last_result.gen_status == api_pb2.GenericResult.GENERATOR_STATUS_UNSPECIFIED
@@ -193,6 +200,76 @@ def test_rate_limited(unix_servicer, event_loop):
     assert items[0].result.data == serialize(42**2)
 
 
+@skip_windows
+@pytest.mark.asyncio
+async def test_blob_inputs(unix_servicer):
+    unix_servicer.blobs["bl-1"] = serialize(((3,), {}))
+    unix_servicer.blobs["bl-2"] = serialize(((4,), {}))
+    inputs = [
+        api_pb2.FunctionGetInputsResponse(
+            inputs=[
+                api_pb2.FunctionGetInputsItem(input_id=f"in-{i}", input=api_pb2.FunctionInput(args_blob_id=blob_id))
+                for i, blob_id in enumerate(["bl-1", "bl-2"])
+            ]
+        ),
+        api_pb2.FunctionGetInputsResponse(inputs=[api_pb2.FunctionGetInputsItem(kill_switch=True)]),
+    ]
+    # The blob server runs on this event loop, so the container has to run in a separate thread
+    client, items = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(_run_container, unix_servicer, "modal_test_support.functions", "square", inputs=inputs)
+    )
+    assert [item.input_id for item in items] == ["in-0", "in-1"]
+    assert [item.result.data for item in items] == [serialize(3**2), serialize(4**2)]
+
+
+def _get_multiple_inputs(args_list) -> list[api_pb2.FunctionGetInputsResponse]:
+    responses = [
+        api_pb2.FunctionGetInputsResponse(
+            inputs=[
+                api_pb2.FunctionGetInputsItem(input_id=f"in-{i}", input=api_pb2.FunctionInput(args=serialize(args)))
+            ]
+        )
+        for i, args in enumerate(args_list)
+    ]
+    return responses + [api_pb2.FunctionGetInputsResponse(inputs=[api_pb2.FunctionGetInputsItem(kill_switch=True)])]
+
+
+@skip_windows
+def test_prefetch_inputs_for_fast_function(unix_servicer, event_loop):
+    inputs = _get_multiple_inputs([((0.1,), {})] * 3)
+    client, items = _run_container(unix_servicer, "modal_test_support.functions", "delay", inputs=inputs)
+    assert [item.input_id for item in items] == ["in-0", "in-1", "in-2"]
+    # Nothing is known about the function during the first input, but once it has completed quickly,
+    # the third input is requested while the second one is still running.
+    get_inputs_times = unix_servicer.container_get_inputs_times
+    assert get_inputs_times[1] > items[0].output_created_at
+    assert get_inputs_times[2] < items[1].output_created_at
+
+
+@skip_windows
+def test_no_prefetch_inputs_for_slow_function(unix_servicer, event_loop):
+    inputs = _get_multiple_inputs([((0.6,), {})] * 2)
+    client, items = _run_container(unix_servicer, "modal_test_support.functions", "delay", inputs=inputs)
+    assert [item.input_id for item in items] == ["in-0", "in-1"]
+    # Each input is only requested once the preceding one has completed
+    get_inputs_times = unix_servicer.container_get_inputs_times
+    assert get_inputs_times[1] > items[0].output_created_at
+    assert get_inputs_times[2] > items[1].output_created_at
+
+
+@skip_windows
+def test_failed_exception_upload(unix_servicer, event_loop):
+    # The first exception is too large to be sent inline, and uploading it fails
+    unix_servicer.fail_blob_create = [Status.PERMISSION_DENIED]
+    inputs = _get_multiple_inputs([((2 * 1024 * 1024,), {}), ((10,), {})])
+    client, items = _run_container(unix_servicer, "modal_test_support.functions", "raises_with_payload", inputs=inputs)
+    assert [item.input_id for item in items] == ["in-0", "in-1"]
+    assert all(item.result.status == api_pb2.GenericResult.GENERIC_STATUS_FAILURE for item in items)
+    assert not items[0].result.data and not items[0].result.data_blob_id
+    assert "xxx" in items[0].result.exception
+    assert deserialize(items[1].result.data, client).args == ("x" * 10,)
+
+
 @skip_windows
 def test_grpc_failure(unix_servicer, event_loop):
     # An error in "Modal code" should cause the entire container to fail
@@ -259,6 +336,22 @@ def test_create_package_mounts_inside_container(unix_servicer, event_loop):
     assert items[0].result.data == serialize(0)
 
 
+@skip_windows
+def test_app_with_dict(unix_servicer, event_loop, monkeypatch):
+    # Like in a fresh container, where nothing has imported modal.dict before the app's objects are loaded
+    monkeypatch.setattr(modal, "dict", modal.dict)
+    monkeypatch.delitem(sys.modules, "modal.dict")
+    monkeypatch.delitem(ObjectMeta.prefix_to_type, "di")
+
+    unix_servicer.app_objects["se-123"] = {"my_dict": "di-123"}
+    client, items = _run_container(unix_servicer, "modal_test_support.functions", "square")
+    assert items[0].result.status == api_pb2.GenericResult.GENERIC_STATUS_SUCCESS
+
+    my_dict = modal.app._container_app["my_dict"]
+    assert type(my_dict).__name__ == "_DictHandle"
+    assert my_dict.object_id == "di-123"
+
+
 @skip_windows
 def test_webhook(unix_servicer, event_loop):
     scope = {
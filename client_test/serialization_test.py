@@ -1,7 +1,9 @@
 # Copyright Modal Labs 2022
+import gc
 import pytest
+import weakref
 
-from modal._serialization import deserialize, serialize
+from modal._serialization import Serializer, _serialize_with_new_pickler, deserialize, serialize
 from modal.aio import AioQueue, AioStub
 
 stub = AioStub()
@@ -18,3 +20,44 @@ async def test_persistent_object(servicer, client):
         q_roundtrip = deserialize(data, running_app)
         # assert isinstance(q_roundtrip, AioQueue)  # TODO(erikbern): is a Handle now
         assert q.object_id == q_roundtrip.object_id
+
+
+def test_serializer_reuse():
+    serializer = Serializer()
+    shared = [1, 2, 3]
+    for obj in [{"a": shared, "b": shared}, "foo", {"a": shared}]:
+        data = serializer.serialize(obj)
+        assert data == _serialize_with_new_pickler(obj)
+        assert deserialize(data, None) == obj
+
+
+class Payload:
+    pass
+
+
+def test_serializer_does_not_retain_objects():
+    serializer = Serializer()
+    obj = Payload()
+    ref = weakref.ref(obj)
+    serializer.serialize(obj)
+    del obj
+    gc.collect()
+    assert ref() is None
+
+
+class SerializesItself:
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce__(self):
+        return (deserialize_value, (serialize(self.value),))
+
+
+def deserialize_value(data):
+    return SerializesItself(deserialize(data, None))
+
+
+def test_serialize_reentrant():
+    obj = deserialize(serialize([SerializesItself([1, 2]), "foo"]), None)
+    assert obj[0].value == [1, 2]
+    assert obj[1] == "foo"
@@ -1,21 +1,71 @@
 # Copyright Modal Labs 2022
+import importlib
+from typing import TYPE_CHECKING
+
 from modal_version import __version__
 
-from .app import App, container_app, is_local
-from .dict import Dict
-from .exception import Error
-from .functions import Function, current_input_id
-from .image import Image
-from .mount import Mount, create_package_mounts
-from .object import lookup
-from .proxy import Proxy
-from .queue import Queue
-from .rate_limit import RateLimit
-from .retries import Retries
-from .schedule import Cron, Period
-from .secret import Secret
-from .shared_volume import SharedVolume
-from .stub import Stub
+if TYPE_CHECKING:
+    from .app import App, container_app, is_local
+    from .dict import Dict
+    from .exception import Error
+    from .functions import Function, current_input_id
+    from .image import Image
+    from .mount import Mount, create_package_mounts
+    from .object import lookup
+    from .proxy import Proxy
+    from .queue import Queue
+    from .rate_limit import RateLimit
+    from .retries import Retries
+    from .schedule import Cron, Period
+    from .secret import Secret
+    from .shared_volume import SharedVolume
+    from .stub import Stub
+
+# Public names are imported lazily from their submodules on first access (PEP 562),
+# so that e.g. `import modal.cli` doesn't have to load the whole client library.
+_lazy_attrs = {
+    "App": "app",
+    "container_app": "app",
+    "is_local": "app",
+    "Dict": "dict",
+    "Error": "exception",
+    "Function": "functions",
+    "current_input_id": "functions",
+    "Image": "image",
+    "Mount": "mount",
+    "create_package_mounts": "mount",
+    "lookup": "object",
+    "Proxy": "proxy",
+    "Queue": "queue",
+    "RateLimit": "rate_limit",
+    "Retries": "retries",
+    "Cron": "schedule",
+    "Period": "schedule",
+    "Secret": "secret",
+    "SharedVolume": "shared_volume",
+    "Stub": "stub",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_attrs:
+        module = importlib.import_module(f".{_lazy_attrs[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    elif not name.startswith("__"):
+        # Submodules used to be loaded eagerly, so keep e.g. `modal.gpu.A100()` working
+        try:
+            return importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attrs))
+
 
 __all__ = [
     "__version__",
@@ -8,6 +8,7 @@ from contextlib import contextmanager
 from typing import AsyncIterator, BinaryIO, Optional, Union, List
 from urllib.parse import urlparse
 
+import aiohttp
 from aiohttp import BytesIOPayload
 from aiohttp.abc import AbstractStreamWriter
 
@@ -30,6 +31,21 @@ LARGE_FILE_LIMIT = 1024 * 1024  # 1MB
 BLOB_MAX_PARALLELISM = 10
 
 
+class TransientHTTPError(ExecutionError):
+    """A blob store request that might succeed when tried again: a server error (5xx), e.g. S3 asking
+    us to slow down, or data that got corrupted on the way."""
+
+
+def _http_status_error(status: int, message: str) -> ExecutionError:
+    # Client errors like 403 or 404 won't go away by trying again
+    error_cls = TransientHTTPError if status >= 500 else ExecutionError
+    return error_cls(message)
+
+
+# Errors from talking to the blob store that are worth retrying
+TRANSIENT_HTTP_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, TransientHTTPError)
+
+
 class BytesIOSegmentPayload(BytesIOPayload):
     """Modified bytes payload for concurrent sends of chunks from the same file
 
@@ -82,7 +98,7 @@ class BytesIOSegmentPayload(BytesIOPayload):
         return self._md5_checksum
 
     async def write(self, writer: AbstractStreamWriter):
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         async def safe_read():
             # concurrency safe reading from same file object
@@ -109,7 +125,7 @@ class BytesIOSegmentPayload(BytesIOPayload):
         return self.segment_length - self.num_bytes_read
 
 
-@retry(n_attempts=5, base_delay=0.5, timeout=None)
+@retry(n_attempts=5, base_delay=0.5, timeout=None, retry_exceptions=TRANSIENT_HTTP_ERRORS)
 async def _upload_to_s3_url(
     upload_url,
     payload: BytesIOSegmentPayload,
@@ -141,7 +157,9 @@ async def _upload_to_s3_url(
                         text = await resp.text()
                     except Exception:
                         text = "<no body>"
-                    raise ExecutionError(f"Put to url {upload_url} failed with status {resp.status}: {text}")
+                    raise _http_status_error(
+                        resp.status, f"Put to url {upload_url} failed with status {resp.status}: {text}"
+                    )
 
                 # client side ETag checksum verification
                 # the s3 ETag of a single part upload is a quoted md5 hex of the uploaded content
@@ -154,7 +172,7 @@ async def _upload_to_s3_url(
 
                 local_md5_hex = payload.md5_checksum().hexdigest()
                 if local_md5_hex != remote_md5:
-                    raise ExecutionError(
+                    raise TransientHTTPError(
                         f"Local data and remote data checksum mismatch ({local_md5_hex} vs {remote_md5})"
                     )
 
@@ -272,7 +290,7 @@ async def blob_upload_file(file_obj: BinaryIO, stub) -> str:
     return await _blob_upload(upload_hashes, file_obj, stub)
 
 
-@retry(n_attempts=5, base_delay=0.1, timeout=None)
+@retry(n_attempts=5, base_delay=0.1, timeout=None, retry_exceptions=TRANSIENT_HTTP_ERRORS)
 async def _download_from_url(download_url) -> bytes:
     async with http_client_with_tls(timeout=None) as session:
         async with session.get(download_url) as resp:
@@ -283,7 +301,7 @@ async def _download_from_url(download_url) -> bytes:
 
             if resp.status != 200:
                 text = await resp.text()
-                raise ExecutionError(f"Get from url failed with status {resp.status}: {text}")
+                raise _http_status_error(resp.status, f"Get from url failed with status {resp.status}: {text}")
             return await resp.read()
 
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 import asyncio
 import base64
 import contextlib
+import dataclasses
 import importlib
 import inspect
 import math
@@ -11,6 +12,7 @@ import signal
 import sys
 import time
 import traceback
+import types
 from typing import Any, AsyncIterator, Callable, Optional
 
 from grpclib import Status
@@ -30,7 +32,7 @@ from ._blob_utils import MAX_OBJECT_SIZE_BYTES, blob_download, blob_upload
 from ._function_utils import load_function_from_module
 from ._proxy_tunnel import proxy_tunnel
 from ._pty import run_in_pty
-from ._serialization import deserialize, serialize
+from ._serialization import Serializer, deserialize
 from ._traceback import extract_traceback
 from ._tracing import extract_tracing_context, set_span_tag, trace, wrap
 from .app import _App
@@ -39,26 +41,40 @@ from .config import logger
 from .exception import InvalidError
 from .functions import AioFunctionHandle, FunctionHandle, _set_current_input_id
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 MAX_OUTPUT_BATCH_SIZE = 100
+OUTPUT_BATCH_DEBOUNCE_TIME = 0.001  # wait this long after sending a batch, so that more outputs can accumulate
 
 RTT_S = 0.5  # conservative estimate of RTT in seconds.
 
+# Return values that a non-generator sync function isn't expected to produce. Same as checking
+# inspect.iscoroutine, inspect.isgenerator and inspect.isasyncgen, but in a single isinstance call.
+_NON_SCALAR_RESULT_TYPES = (types.CoroutineType, types.GeneratorType, types.AsyncGeneratorType)
+
 
 class UserException(Exception):
     # Used to shut down the task gracefully
     pass
 
 
-class SequenceNumber:
-    def __init__(self, initial_value: int):
-        self._value: int = initial_value
-
-    def increase(self):
-        self._value += 1
+@dataclasses.dataclass
+class _FailedOutput:
+    """Serialized failure of an input, put on the output queue so that uploading the exception
+    is left to the output sender rather than holding up the next input."""
 
-    @property
-    def value(self) -> int:
-        return self._value
+    input_id: str
+    gen_index: int
+    input_started_at: Optional[float]
+    output_created_at: float
+    data: Optional[bytes]
+    exception: str
+    formatted_tb: str
+    serialized_tb: Optional[bytes]
+    tb_line_cache: Optional[bytes]
 
 
 def get_is_async(function):
@@ -81,7 +97,13 @@ def run_with_signal_handler(coro):
     the task in the case of SIGINT or SIGTERM. Prevents stray cancellation errors
     from propagating up."""
 
-    loop = asyncio.new_event_loop()
+    # uvloop is installed in the container runtime, but is optional when running this locally
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    if sys.version_info >= (3, 12):
+        # Tasks created by user code start running immediately, and coroutines that finish without
+        # suspending never get scheduled on the loop. This means the first step of `create_task(coro)`
+        # runs synchronously, which code relying on the lazy default task factory could notice.
+        loop.set_task_factory(asyncio.eager_task_factory)
     task = asyncio.ensure_future(coro, loop=loop)
     for s in [signal.SIGINT, signal.SIGTERM]:
         loop.add_signal_handler(s, task.cancel)
@@ -99,32 +121,41 @@ class _FunctionIOManager:
     Then we could potentially move a bunch of the global functions onto it.
     """
 
-    def __init__(self, container_args, client):
+    def __init__(self, container_args, client: _Client):
         self.task_id = container_args.task_id
         self.function_id = container_args.function_id
         self.app_id = container_args.app_id
         self.function_def = container_args.function_def
-        self.client = client
         self.calls_completed = 0
         self.total_user_time: float = 0
+        # Derived from the two above, and updated whenever a call completes
+        self._cached_avg_call_time: float = 0
+        self._cached_max_inputs: int = 1
         self.current_input_id: Optional[str] = None
         self.current_input_started_at: Optional[float] = None
-        self._client = synchronizer._translate_in(self.client)  # make it a _Client object
-        assert isinstance(self._client, _Client)
+        self._client = client
+        # Request protos sent in a loop are reused rather than rebuilt for every request.
+        self._heartbeat_request = api_pb2.ContainerHeartbeatRequest()
+        self._put_outputs_request = api_pb2.FunctionPutOutputsRequest()
+        self._serializer = Serializer()  # only used from the event loop thread, doesn't retain serialized objects
 
     @wrap()
     async def initialize_app(self):
         await _App.init_container(self._client, self.app_id)
 
     async def _heartbeat(self):
-        request = api_pb2.ContainerHeartbeatRequest()
+        request = self._heartbeat_request
         if self.current_input_id is not None:
             request.current_input_id = self.current_input_id
+        else:
+            request.ClearField("current_input_id")
         if self.current_input_started_at is not None:
             request.current_input_started_at = self.current_input_started_at
+        else:
+            request.ClearField("current_input_started_at")
 
         # TODO(erikbern): capture exceptions?
-        await retry_transient_errors(self.client.stub.ContainerHeartbeat, request, attempt_timeout=HEARTBEAT_TIMEOUT)
+        await retry_transient_errors(self._client.stub.ContainerHeartbeat, request, attempt_timeout=HEARTBEAT_TIMEOUT)
 
     @contextlib.asynccontextmanager
     async def heartbeats(self):
@@ -135,7 +166,7 @@ class _FunctionIOManager:
     async def get_serialized_function(self) -> tuple[Optional[Any], Callable]:
         # Fetch the serialized function definition
         request = api_pb2.FunctionGetSerializedRequest(function_id=self.function_id)
-        response = await self.client.stub.FunctionGetSerialized(request)
+        response = await self._client.stub.FunctionGetSerialized(request)
         fun = self.deserialize(response.function_serialized)
 
         if response.class_serialized:
@@ -146,86 +177,119 @@ class _FunctionIOManager:
         return cls, fun
 
     def serialize(self, obj: Any) -> bytes:
-        return serialize(obj)
+        return self._serializer.serialize(obj)
 
     def deserialize(self, data: bytes) -> Any:
         return deserialize(data, self._client)
 
     @wrap()
-    async def populate_input_blobs(self, item):
-        args = await blob_download(item.args_blob_id, self.client.stub)
-
-        # Mutating
-        item.ClearField("args_blob_id")
-        item.args = args
-        return item
+    async def download_input_args(self, item: api_pb2.FunctionInput) -> bytes:
+        # Returned as is rather than stored back in `item.args`, which would copy it
+        return await blob_download(item.args_blob_id, self._client.stub)
 
-    def get_average_call_time(self) -> float:
-        if self.calls_completed == 0:
-            return 0
+    def _record_call_completed(self, call_time: float):
+        self.calls_completed += 1
+        self.total_user_time += call_time
+        self._cached_avg_call_time = self.total_user_time / self.calls_completed
+        self._cached_max_inputs = math.ceil(RTT_S / max(self._cached_avg_call_time, 1e-6))
 
-        return self.total_user_time / self.calls_completed
+    def _should_prefetch_inputs(self) -> bool:
+        return self.calls_completed > 0 and self._cached_avg_call_time < RTT_S
 
-    def get_max_inputs_to_fetch(self):
-        if self.calls_completed == 0:
-            return 1
+    async def _get_inputs(self, request: api_pb2.FunctionGetInputsRequest) -> api_pb2.FunctionGetInputsResponse:
+        request.average_call_time = self._cached_avg_call_time
+        request.max_values = self._cached_max_inputs  # Deprecated; remove.
 
-        return math.ceil(RTT_S / max(self.get_average_call_time(), 1e-6))
+        with trace("get_inputs"):
+            return await retry_transient_errors(self._client.stub.FunctionGetInputs, request)
 
     async def _generate_inputs(
         self,
-    ) -> AsyncIterator[tuple[str, api_pb2.FunctionInput]]:
+    ) -> AsyncIterator[tuple[str, bytes]]:
+        # The same request is sent for every fetch, only the call time stats are updated in place.
         request = api_pb2.FunctionGetInputsRequest(function_id=self.function_id)
         eof_received = False
-        while not eof_received:
-            request.average_call_time = self.get_average_call_time()
-            request.max_values = self.get_max_inputs_to_fetch()  # Deprecated; remove.
-
-            with trace("get_inputs"):
-                response = await retry_transient_errors(self.client.stub.FunctionGetInputs, request)
-
-            if response.rate_limit_sleep_duration:
-                logger.info(
-                    "Task exceeded rate limit, sleeping for %.2fs before trying again."
-                    % response.rate_limit_sleep_duration
-                )
-                await asyncio.sleep(response.rate_limit_sleep_duration)
-                continue
-
-            if not response.inputs:
-                continue
-
-            for item in response.inputs:
-                if item.kill_switch:
-                    logger.debug(f"Task {self.task_id} input received kill signal.")
-                    eof_received = True
-                    break
-
-                # If we got a pointer to a blob, download it from S3.
-                if item.input.WhichOneof("args_oneof") == "args_blob_id":
-                    input_pb = await self.populate_input_blobs(item.input)
-                else:
-                    input_pb = item.input
-
-                yield (item.input_id, input_pb)
-
-                if item.input.final_input:
-                    eof_received = True
-                    break
+        # For functions that are known to be fast, the request for the next batch is sent before yielding the
+        # last input of the current one, so that the roundtrip to the server overlaps with the user code processing
+        # that input. Slow functions don't prefetch, since that would claim an input that another container could
+        # have started on in the meantime.
+        fetch_task: Optional[asyncio.Future] = asyncio.ensure_future(self._get_inputs(request))
+        blob_downloads: dict[int, asyncio.Future] = {}
+        try:
+            while not eof_received:
+                response = await fetch_task
+                fetch_task = None
+
+                if response.rate_limit_sleep_duration:
+                    logger.info(
+                        "Task exceeded rate limit, sleeping for %.2fs before trying again."
+                        % response.rate_limit_sleep_duration
+                    )
+                    await asyncio.sleep(response.rate_limit_sleep_duration)
+
+                # If we got pointers to blobs, start downloading all of them from S3 right away,
+                # rather than waiting for the user code to finish processing the preceding inputs.
+                blob_downloads = {
+                    i: asyncio.ensure_future(self.download_input_args(item.input))
+                    for i, item in enumerate(response.inputs)
+                    if item.input.WhichOneof("args_oneof") == "args_blob_id"
+                }
+
+                for i, item in enumerate(response.inputs):
+                    if item.kill_switch:
+                        logger.debug(f"Task {self.task_id} input received kill signal.")
+                        eof_received = True
+                        break
+
+                    if i in blob_downloads:
+                        serialized_args = await blob_downloads.pop(i)
+                    else:
+                        serialized_args = item.input.args
+
+                    if item.input.final_input:
+                        eof_received = True
+                    elif i == len(response.inputs) - 1 and self._should_prefetch_inputs():
+                        fetch_task = asyncio.ensure_future(self._get_inputs(request))
+
+                    yield (item.input_id, serialized_args)
+
+                    if eof_received:
+                        break
+
+                if not eof_received and fetch_task is None:
+                    fetch_task = asyncio.ensure_future(self._get_inputs(request))
+        finally:
+            prefetch_tasks = list(blob_downloads.values())
+            if fetch_task is not None:
+                prefetch_tasks.append(fetch_task)
+            for task in prefetch_tasks:
+                task.cancel()
+            # Retrieve the results, so that errors aren't only reported as "Task exception was never retrieved"
+            for result in await asyncio.gather(*prefetch_tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning(f"Prefetching inputs failed: {result!r}")
 
     async def _send_outputs(self):
         """Background task that tries to drain output queue until it's empty,
         or the output buffer changes, and then sends the entire batch in one request.
         """
-        async for outputs in queue_batch_iterator(self.output_queue, MAX_OUTPUT_BATCH_SIZE, 0):
-            req = api_pb2.FunctionPutOutputsRequest(outputs=outputs)
-            await retry_transient_errors(
-                self.client.stub.FunctionPutOutputs,
-                req,
-                attempt_timeout=3.0,
-                total_timeout=20.0,
-                additional_status_codes=[Status.RESOURCE_EXHAUSTED],
-            )
+        async for outputs in queue_batch_iterator(self.output_queue, MAX_OUTPUT_BATCH_SIZE, OUTPUT_BATCH_DEBOUNCE_TIME):
+            for i, output in enumerate(outputs):
+                if isinstance(output, _FailedOutput):
+                    outputs[i] = await self._build_failed_output(output)
+            req = self._put_outputs_request
+            req.outputs.extend(outputs)
+            try:
+                await retry_transient_errors(
+                    self._client.stub.FunctionPutOutputs,
+                    req,
+                    attempt_timeout=3.0,
+                    total_timeout=20.0,
+                    additional_status_codes=[Status.RESOURCE_EXHAUSTED],
+                )
+            finally:
+                # Don't hold on to the sent outputs until the next batch
+                del req.outputs[:]
             # TODO(erikbern): we'll get a RESOURCE_EXCHAUSTED if the buffer is full server-side.
             # It's possible we want to retry "harder" for this particular error.
 
@@ -236,34 +300,107 @@ class _FunctionIOManager:
         async with TaskContext(grace=10) as tc:
             tc.create_task(self._send_outputs())
             try:
-                async for input_id, input_pb in self._generate_inputs():
-                    args, kwargs = self.deserialize(input_pb.args) if input_pb.args else ((), {})
+                async for input_id, serialized_args in self._generate_inputs():
+                    args, kwargs = self.deserialize(serialized_args) if serialized_args else ((), {})
                     _set_current_input_id(input_id)
                     self.current_input_id, self.current_input_started_at = (input_id, time.time())
+                    started_at_monotonic = time.monotonic()  # wall clock time above is only reported to the server
                     yield input_id, args, kwargs
                     _set_current_input_id(None)
-                    self.total_user_time += time.time() - self.current_input_started_at
+                    self._record_call_completed(time.monotonic() - started_at_monotonic)
                     self.current_input_id, self.current_input_started_at = (None, None)
-                    self.calls_completed += 1
             finally:
-                await self.output_queue.put(None)
+                self.output_queue.put_nowait(None)
 
-    async def _enqueue_output(self, input_id, gen_index, **kwargs):
-        # upload data to S3 if too big.
-        if "data" in kwargs and kwargs["data"] and len(kwargs["data"]) > MAX_OBJECT_SIZE_BYTES:
-            data_blob_id = await blob_upload(kwargs["data"], self.client.stub)
-            # mutating kwargs.
-            kwargs.pop("data")
-            kwargs["data_blob_id"] = data_blob_id
-
-        output = api_pb2.FunctionPutOutputsItem(
+    async def _build_output(
+        self,
+        input_id,
+        gen_index: int,
+        input_started_at: Optional[float],
+        output_created_at: float,
+        *,
+        status: api_pb2.GenericResult.GenericStatus.V,
+        data: Optional[bytes] = None,
+        gen_status: api_pb2.GenericResult.GeneratorStatus.V = api_pb2.GenericResult.GENERATOR_STATUS_UNSPECIFIED,
+        exception: Optional[str] = None,
+        tb_str: Optional[str] = None,
+        serialized_tb: Optional[bytes] = None,
+        tb_line_cache: Optional[bytes] = None,
+    ):
+        result = api_pb2.GenericResult(
+            status=status,
+            gen_status=gen_status,
+            exception=exception,
+            traceback=tb_str,
+            serialized_tb=serialized_tb,
+            tb_line_cache=tb_line_cache,
+        )
+        if data:
+            # upload data to S3 if too big.
+            if len(data) > MAX_OBJECT_SIZE_BYTES:
+                result.data_blob_id = await blob_upload(data, self._client.stub)
+            else:
+                result.data = data
+
+        return api_pb2.FunctionPutOutputsItem(
             input_id=input_id,
-            input_started_at=self.current_input_started_at,
-            output_created_at=time.time(),
+            input_started_at=input_started_at,
+            output_created_at=output_created_at,
             gen_index=gen_index,
-            result=api_pb2.GenericResult(**kwargs),
+            result=result,
         )
-        await self.output_queue.put(output)
+
+    async def _enqueue_output(
+        self,
+        input_id,
+        gen_index: int,
+        *,
+        status: api_pb2.GenericResult.GenericStatus.V,
+        data: Optional[bytes] = None,
+        gen_status: api_pb2.GenericResult.GeneratorStatus.V = api_pb2.GenericResult.GENERATOR_STATUS_UNSPECIFIED,
+        exception: Optional[str] = None,
+        tb_str: Optional[str] = None,
+        serialized_tb: Optional[bytes] = None,
+        tb_line_cache: Optional[bytes] = None,
+    ):
+        output = await self._build_output(
+            input_id,
+            gen_index,
+            self.current_input_started_at,
+            time.time(),
+            status=status,
+            data=data,
+            gen_status=gen_status,
+            exception=exception,
+            tb_str=tb_str,
+            serialized_tb=serialized_tb,
+            tb_line_cache=tb_line_cache,
+        )
+        # The queue is unbounded, so this never has to wait for the sender
+        self.output_queue.put_nowait(output)
+
+    async def _build_failed_output(self, failed: _FailedOutput) -> api_pb2.FunctionPutOutputsItem:
+        async def build_output(data: Optional[bytes]) -> api_pb2.FunctionPutOutputsItem:
+            return await self._build_output(
+                failed.input_id,
+                failed.gen_index,
+                failed.input_started_at,
+                failed.output_created_at,
+                status=api_pb2.GenericResult.GENERIC_STATUS_FAILURE,
+                data=data,
+                exception=failed.exception,
+                tb_str=failed.formatted_tb,
+                serialized_tb=failed.serialized_tb,
+                tb_line_cache=failed.tb_line_cache,
+            )
+
+        try:
+            return await build_output(failed.data)
+        except Exception:
+            # The sender is shared by all outputs, so it can't die because of a single exception.
+            # The failure is still reported, just without the exception object.
+            logger.exception(f"Failed to upload exception for input {failed.input_id}")
+            return await build_output(None)
 
     def serialize_exception(self, exc: BaseException) -> Optional[bytes]:
         try:
@@ -297,7 +434,8 @@ class _FunctionIOManager:
             raise
         except BaseException as exc:
             # Since this is on a different thread, sys.exc_info() can't find the exception in the stack.
-            traceback.print_exception(type(exc), exc, exc.__traceback__)
+            formatted_tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+            print(formatted_tb, end="", file=sys.stderr)
 
             serialized_tb, tb_line_cache = self.serialize_traceback(exc)
 
@@ -305,19 +443,19 @@ class _FunctionIOManager:
                 status=api_pb2.GenericResult.GENERIC_STATUS_FAILURE,
                 data=self.serialize_exception(exc),
                 exception=repr(exc),
-                traceback="".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+                traceback=formatted_tb,
                 serialized_tb=serialized_tb,
                 tb_line_cache=tb_line_cache,
             )
 
             req = api_pb2.TaskResultRequest(task_id=self.task_id, result=result)
-            await retry_transient_errors(self.client.stub.TaskResult, req)
+            await retry_transient_errors(self._client.stub.TaskResult, req)
 
             # Shut down the task gracefully
             raise UserException()
 
     @contextlib.asynccontextmanager
-    async def handle_input_exception(self, input_id, output_index: SequenceNumber):
+    async def handle_input_exception(self, input_id, get_output_index: Callable[[], int]):
         try:
             with trace("input"):
                 set_span_tag("input_id", input_id)
@@ -326,24 +464,29 @@ class _FunctionIOManager:
             raise
         except BaseException as exc:
             # print exception so it's logged
-            traceback.print_exc()
-            serialized_tb, tb_line_cache = self.serialize_traceback(exc)
+            formatted_tb = traceback.format_exc()
+            print(formatted_tb, end="", file=sys.stderr)
 
+            # The exception is serialized right away, while the user code can't mutate it anymore.
             # Note: we're not serializing the traceback since it contains
             # local references that means we can't unpickle it. We *are*
             # serializing the exception, which may have some issues (there
             # was an earlier note about it that it might not be possible
             # to unpickle it in some cases). Let's watch out for issues.
-            await self._enqueue_output(
+            serialized_tb, tb_line_cache = self.serialize_traceback(exc)
+            failed_output = _FailedOutput(
                 input_id,
-                output_index.value,
-                status=api_pb2.GenericResult.GENERIC_STATUS_FAILURE,
+                get_output_index(),
+                self.current_input_started_at,
+                time.time(),
                 data=self.serialize_exception(exc),
                 exception=repr(exc),
-                traceback=traceback.format_exc(),
+                formatted_tb=formatted_tb,
                 serialized_tb=serialized_tb,
                 tb_line_cache=tb_line_cache,
             )
+            # Going through the same queue keeps it ordered after the input's other outputs
+            self.output_queue.put_nowait(failed_output)
 
     async def enqueue_output(self, input_id, output_index: int, data):
         await self._enqueue_output(
@@ -392,27 +535,27 @@ def call_function_sync(
 
     try:
         for input_id, args, kwargs in function_io_manager.run_inputs_outputs():
-            output_index = SequenceNumber(0)
-            with function_io_manager.handle_input_exception(input_id, output_index):
+            output_index = 0  # read by the exception handler through the closure
+            with function_io_manager.handle_input_exception(input_id, lambda: output_index):
                 res = fun(*args, **kwargs)
 
                 # TODO(erikbern): any exception below shouldn't be considered a user exception
                 if is_generator:
-                    if not inspect.isgenerator(res):
+                    if not isinstance(res, types.GeneratorType):
                         raise InvalidError(f"Generator function returned value of type {type(res)}")
 
                     for value in res:
-                        function_io_manager.enqueue_generator_value(input_id, output_index.value, value)
-                        output_index.increase()
+                        function_io_manager.enqueue_generator_value(input_id, output_index, value)
+                        output_index += 1
 
-                    function_io_manager.enqueue_generator_eof(input_id, output_index.value)
+                    function_io_manager.enqueue_generator_eof(input_id, output_index)
                 else:
-                    if inspect.iscoroutine(res) or inspect.isgenerator(res) or inspect.isasyncgen(res):
+                    if isinstance(res, _NON_SCALAR_RESULT_TYPES):
                         raise InvalidError(
                             f"Sync (non-generator) function return value of type {type(res)}."
                             " You might need to use @stub.function(..., is_generator=True)."
                         )
-                    function_io_manager.enqueue_output(input_id, output_index.value, res)
+                    function_io_manager.enqueue_output(input_id, output_index, res)
     finally:
         if obj is not None and hasattr(obj, "__exit__"):
             with function_io_manager.handle_user_exception():
@@ -426,6 +569,11 @@ async def call_function_async(
     fun: Callable,
     is_generator: bool,
 ):
+    # Note that the user code runs on a separate event loop from the one in the synchronicity thread,
+    # where the output queue and the client's gRPC channel live. So every output has to go through
+    # `aio_function_io_manager`, even though calling `_FunctionIOManager` directly would save a thread hop:
+    # asyncio queues, futures and grpclib channels can't be used from another loop.
+
     # If this function is on a class, instantiate it and enter it
     if obj is not None:
         if hasattr(obj, "__aenter__"):
@@ -438,26 +586,26 @@ async def call_function_async(
 
     try:
         async for input_id, args, kwargs in aio_function_io_manager.run_inputs_outputs():
-            output_index = SequenceNumber(0)  # mutable number we can increase from the generator loop
-            async with aio_function_io_manager.handle_input_exception(input_id, output_index):
+            output_index = 0  # read by the exception handler through the closure
+            async with aio_function_io_manager.handle_input_exception(input_id, lambda: output_index):
                 res = fun(*args, **kwargs)
 
                 # TODO(erikbern): any exception below shouldn't be considered a user exception
                 if is_generator:
-                    if not inspect.isasyncgen(res):
+                    if not isinstance(res, types.AsyncGeneratorType):
                         raise InvalidError(f"Async generator function returned value of type {type(res)}")
                     async for value in res:
-                        await aio_function_io_manager.enqueue_generator_value(input_id, output_index.value, value)
-                        output_index.increase()
-                    await aio_function_io_manager.enqueue_generator_eof(input_id, output_index.value)
+                        await aio_function_io_manager.enqueue_generator_value(input_id, output_index, value)
+                        output_index += 1
+                    await aio_function_io_manager.enqueue_generator_eof(input_id, output_index)
                 else:
-                    if not inspect.iscoroutine(res) or inspect.isgenerator(res) or inspect.isasyncgen(res):
+                    if not isinstance(res, types.CoroutineType):
                         raise InvalidError(
                             f"Async (non-generator) function returned value of type {type(res)}"
                             " You might need to use @stub.function(..., is_generator=True)."
                         )
                     value = await res
-                    await aio_function_io_manager.enqueue_output(input_id, output_index.value, value)
+                    await aio_function_io_manager.enqueue_output(input_id, output_index, value)
     finally:
         if obj is not None:
             if hasattr(obj, "__aexit__"):
@@ -468,6 +616,31 @@ async def call_function_async(
                     obj.__exit__(*sys.exc_info())
 
 
+def _wrap_asgi_app(fun: Callable, webhook_config: api_pb2.WebhookConfig) -> Callable:
+    # function returns an asgi_app, that we can use as a callable.
+    asgi_app = fun()
+    return asgi_app_wrapper(asgi_app)
+
+
+def _wrap_wsgi_app(fun: Callable, webhook_config: api_pb2.WebhookConfig) -> Callable:
+    # function returns an wsgi_app, that we can use as a callable.
+    wsgi_app = fun()
+    return wsgi_app_wrapper(wsgi_app)
+
+
+def _wrap_webhook_function(fun: Callable, webhook_config: api_pb2.WebhookConfig) -> Callable:
+    # function is webhook without an ASGI app. Create one for it.
+    asgi_app = webhook_asgi_app(fun, webhook_config.method)
+    return asgi_app_wrapper(asgi_app)
+
+
+_WEBHOOK_WRAPPERS: dict[int, Callable[[Callable, api_pb2.WebhookConfig], Callable]] = {
+    api_pb2.WEBHOOK_TYPE_ASGI_APP: _wrap_asgi_app,
+    api_pb2.WEBHOOK_TYPE_WSGI_APP: _wrap_wsgi_app,
+    api_pb2.WEBHOOK_TYPE_FUNCTION: _wrap_webhook_function,
+}
+
+
 @wrap()
 def import_function(function_def: api_pb2.Function, ser_cls, ser_fun) -> tuple[Any, Callable, bool]:
     # This is not in function_io_manager, so that any global scope code that runs during import
@@ -498,18 +671,9 @@ def import_function(function_def: api_pb2.Function, ser_cls, ser_fun) -> tuple[A
     else:
         obj = None
 
-    if function_def.webhook_config.type == api_pb2.WEBHOOK_TYPE_ASGI_APP:
-        # function returns an asgi_app, that we can use as a callable.
-        asgi_app = fun()
-        return obj, asgi_app_wrapper(asgi_app), True
-    elif function_def.webhook_config.type == api_pb2.WEBHOOK_TYPE_WSGI_APP:
-        # function returns an wsgi_app, that we can use as a callable.
-        wsgi_app = fun()
-        return obj, wsgi_app_wrapper(wsgi_app), True
-    elif function_def.webhook_config.type == api_pb2.WEBHOOK_TYPE_FUNCTION:
-        # function is webhook without an ASGI app. Create one for it.
-        asgi_app = webhook_asgi_app(fun, function_def.webhook_config.method)
-        return obj, asgi_app_wrapper(asgi_app), True
+    webhook_wrapper = _WEBHOOK_WRAPPERS.get(function_def.webhook_config.type)
+    if webhook_wrapper is not None:
+        return obj, webhook_wrapper(fun, function_def.webhook_config), True
     else:
         return obj, fun, is_async
 
@@ -522,7 +686,9 @@ def main(container_args: api_pb2.ContainerArguments, client: Client):
 
     # This is a bit weird but we need both the blocking and async versions of FunctionIOManager.
     # At some point, we should fix that by having built-in support for running "user code"
-    _function_io_manager = _FunctionIOManager(container_args, client)
+    # The unwrapped client is passed in, since the stub of the synchronized Client goes through a wrapper
+    # on every access
+    _function_io_manager = _FunctionIOManager(container_args, synchronizer._translate_in(client))
     function_io_manager, aio_function_io_manager = synchronize_apis(_function_io_manager)
 
     function_io_manager.initialize_app()
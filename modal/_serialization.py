@@ -1,6 +1,7 @@
 # Copyright Modal Labs 2022
 import io
 import pickle
+import threading
 
 import cloudpickle
 
@@ -34,13 +35,51 @@ class Unpickler(pickle.Unpickler):
         return Handle._from_id(object_id, self.client, None)
 
 
-def serialize(obj):
-    """Serializes object and replaces all references to the client class by a placeholder."""
+def _serialize_with_new_pickler(obj) -> bytes:
     buf = io.BytesIO()
     Pickler(buf).dump(obj)
     return buf.getvalue()
 
 
+class Serializer:
+    """Serializes objects like `serialize`, but reuses the same pickler and buffer between calls.
+
+    This is cheaper when serializing lots of small objects. Not thread-safe."""
+
+    def __init__(self):
+        self._buf = io.BytesIO()
+        self._pickler = Pickler(self._buf)
+        self._in_use = False
+
+    def serialize(self, obj) -> bytes:
+        if self._in_use:
+            # Called again while pickling, e.g. from some object's __reduce__
+            return _serialize_with_new_pickler(obj)
+
+        self._in_use = True
+        try:
+            self._pickler.dump(obj)
+            return self._buf.getvalue()
+        finally:
+            # Reset right away, so that the pickled object and its payload aren't kept alive until the next call
+            self._pickler.clear_memo()
+            self._pickler.globals_ref.clear()
+            self._buf.seek(0)
+            self._buf.truncate()
+            self._in_use = False
+
+
+_thread_local = threading.local()
+
+
+def serialize(obj):
+    """Serializes object and replaces all references to the client class by a placeholder."""
+    serializer = getattr(_thread_local, "serializer", None)
+    if serializer is None:
+        serializer = _thread_local.serializer = Serializer()
+    return serializer.serialize(obj)
+
+
 def deserialize(s: bytes, client):
     """Deserializes object and replaces all client placeholders by self."""
     return Unpickler(client, io.BytesIO(s)).load()
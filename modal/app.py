@@ -1,6 +1,7 @@
 # Copyright Modal Labs 2022
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING, Dict, Optional, TypeVar
 
 from modal_proto import api_pb2
@@ -17,6 +18,8 @@ if TYPE_CHECKING:
 else:
     Tree = TypeVar("Tree")
 
+MAX_CONCURRENT_OBJECT_LOADS = 16
+
 
 class _App:
     """Apps are the user representation of an actively running Modal process.
@@ -42,6 +45,8 @@ class _App:
     _tag_to_object: Dict[str, Handle]
     _tag_to_existing_id: Dict[str, str]
     _local_uuid_to_object: Dict[str, Handle]
+    _local_uuid_to_pending_load: Dict[str, asyncio.Task]
+    _local_uuid_to_existing_id: Dict[str, str]
     _client: _Client
     _app_id: str
 
@@ -60,6 +65,8 @@ class _App:
         self._tag_to_object = tag_to_object or {}
         self._tag_to_existing_id = tag_to_existing_id or {}
         self._local_uuid_to_object = {}
+        self._local_uuid_to_pending_load = {}
+        self._local_uuid_to_existing_id = {}
 
     @property
     def client(self) -> _Client:
@@ -80,6 +87,21 @@ class _App:
             # We already created this object before, shortcut this method
             return cached_obj
 
+        # Objects are loaded concurrently, so a dependency shared by several objects
+        # may already be in the process of being created.
+        pending_load = self._local_uuid_to_pending_load.get(obj.local_uuid)
+        if pending_load is None:
+            if existing_object_id is None:
+                # Tagged objects can also be created as a dependency of another object, before their own load
+                existing_object_id = self._local_uuid_to_existing_id.get(obj.local_uuid)
+            pending_load = asyncio.ensure_future(self._load_uncached(obj, progress, existing_object_id))
+            self._local_uuid_to_pending_load[obj.local_uuid] = pending_load
+            pending_load.add_done_callback(lambda _: self._local_uuid_to_pending_load.pop(obj.local_uuid, None))
+        return await asyncio.shield(pending_load)
+
+    async def _load_uncached(
+        self, obj: Provider, progress: Optional[Tree] = None, existing_object_id: Optional[str] = None
+    ) -> Handle:
         resolver = Resolver(self, progress, self._client, self.app_id, existing_object_id)
 
         # Create object
@@ -108,15 +130,35 @@ class _App:
         """Create objects that have been defined but not created on the server."""
         for tag, provider in blueprint.items():
             existing_object_id = self._tag_to_existing_id.get(tag)
-            self._tag_to_object[tag] = await self._load(provider, progress, existing_object_id)
+            if existing_object_id is not None:
+                self._local_uuid_to_existing_id[provider.local_uuid] = existing_object_id
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_OBJECT_LOADS)
+
+        async def _load_tagged(provider: Provider) -> Handle:
+            async with semaphore:
+                return await self._load(provider, progress)
+
+        # Independent objects are created concurrently, rather than one roundtrip after the other
+        load_tasks = [asyncio.ensure_future(_load_tagged(provider)) for provider in blueprint.values()]
+        try:
+            created_objs = await asyncio.gather(*load_tasks)
+        except BaseException:
+            # Don't leave the other loads creating objects in the background
+            pending = load_tasks + list(self._local_uuid_to_pending_load.values())
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        for tag, created_obj in zip(blueprint.keys(), created_objs):
+            self._tag_to_object[tag] = created_obj
 
         # Create the app (and send a list of all tagged obs)
         # TODO(erikbern): we should delete objects from a previous version that are no longer needed
         # We just delete them from the app, but the actual objects will stay around
         indexed_object_ids = {tag: obj.object_id for tag, obj in self._tag_to_object.items()}
         unindexed_object_ids = list(
-            set(obj.object_id for obj in self._local_uuid_to_object.values())
-            - set(obj.object_id for obj in self._tag_to_object.values())
+            {obj.object_id for obj in self._local_uuid_to_object.values()}.difference(indexed_object_ids.values())
         )
         req_set = api_pb2.AppSetObjectsRequest(
             app_id=self._app_id,
@@ -1,4 +1,6 @@
 # Copyright Modal Labs 2022
+import json
+
 import typer
 
 from modal.config import config
@@ -18,4 +20,4 @@ config_cli = typer.Typer(
 @config_cli.command(help="Show current configuration values (debug command).")
 def show():
     # This is just a test command
-    print(config)
+    print(json.dumps(config.to_dict(), indent=2))
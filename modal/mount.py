@@ -25,6 +25,20 @@ from .exception import InvalidError, NotFoundError, deprecation_warning
 from .object import Handle, Provider
 
 
+MAX_FILE_SPEC_BATCH_SIZE = 64
+
+
+def _get_file_upload_specs(files: List[Tuple[Path, str]]) -> List[FileUploadSpec]:
+    file_specs = []
+    for local_filename, remote_filename in files:
+        try:
+            file_specs.append(get_file_upload_spec(local_filename, remote_filename))
+        except FileNotFoundError as exc:
+            # Can happen with temporary files (e.g. emacs will write temp files and delete them quickly)
+            logger.info(f"Ignoring file not found: {exc}")
+    return file_specs
+
+
 def client_mount_name():
     return f"modal-client-mount-{__version__}"
 
@@ -239,19 +253,19 @@ class _Mount(Provider[_MountHandle]):
         for entry in self._entries:
             all_files += list(entry.get_files_to_upload())
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         with concurrent.futures.ThreadPoolExecutor() as exe:
+            # Send files to the executor in batches, so that mounts with lots of small files don't pay for a
+            # roundtrip to a worker thread per file. There are still a few batches per worker to balance the load.
+            batch_size = max(1, min(MAX_FILE_SPEC_BATCH_SIZE, len(all_files) // (exe._max_workers * 4)))
             futs = []
-            for local_filename, remote_filename in all_files:
-                futs.append(loop.run_in_executor(exe, get_file_upload_spec, local_filename, remote_filename))
+            for i in range(0, len(all_files), batch_size):
+                futs.append(loop.run_in_executor(exe, _get_file_upload_specs, all_files[i : i + batch_size]))
 
-            logger.debug(f"Computing checksums for {len(futs)} files using {exe._max_workers} workers")
-            for i, fut in enumerate(asyncio.as_completed(futs)):
-                try:
-                    yield await fut
-                except FileNotFoundError as exc:
-                    # Can happen with temporary files (e.g. emacs will write temp files and delete them quickly)
-                    logger.info(f"Ignoring file not found: {exc}")
+            logger.debug(f"Computing checksums for {len(all_files)} files using {exe._max_workers} workers")
+            for fut in asyncio.as_completed(futs):
+                for file_spec in await fut:
+                    yield file_spec
 
     async def _load(self, resolver: Resolver):
         # Run a threadpool to compute hash values, and use concurrent coroutines to register files.
@@ -332,12 +346,21 @@ def _create_client_mount():
 
     # TODO(erikbern): this is incredibly dumb, but we only want to include packages that start with "modal"
     # TODO(erikbern): merge functionality with _function_utils._is_modal_path
-    prefix = os.path.join(base_path, "modal")
-
-    def condition(arg):
-        return module_mount_condition(arg) and arg.startswith(prefix)
+    # Only add the top-level entries that start with "modal", rather than walking all of base_path
+    # (typically site-packages) and filtering out almost every file.
+    mount = _Mount(_entries=[])
+    for entry in os.scandir(base_path):
+        if not entry.name.startswith("modal"):
+            continue
+        remote_path = PurePosixPath("/pkg", entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            mount = mount.add_local_dir(
+                entry.path, remote_path=remote_path, condition=module_mount_condition, recursive=True
+            )
+        elif entry.is_file() and module_mount_condition(entry.path):
+            mount = mount.add_local_file(entry.path, remote_path=remote_path)
 
-    return _Mount.from_local_dir(base_path, remote_path="/pkg/", condition=condition, recursive=True)
+    return mount
 
 
 _, aio_create_client_mount = synchronize_apis(_create_client_mount)
@@ -1,5 +1,6 @@
 # Copyright Modal Labs 2022
 from datetime import date
+import importlib
 import uuid
 from typing import Awaitable, Callable, Generic, Optional, Type, TypeVar
 
@@ -15,6 +16,15 @@ from .exception import InvalidError, NotFoundError, deprecation_warning
 
 H = TypeVar("H", bound="Handle")
 
+# Modules that define handle types. Each type registers its object id prefix when its module is imported,
+# but since `modal` imports its submodules lazily, they might not have been imported when we get an id.
+_HANDLE_TYPE_MODULES = ["dict", "functions", "image", "mount", "proxy", "queue", "secret", "shared_volume"]
+
+
+def _import_handle_types():
+    for module_name in _HANDLE_TYPE_MODULES:
+        importlib.import_module(f".{module_name}", __package__)
+
 
 class Handle(metaclass=ObjectMeta):
     """mdmd:hidden The shared base class of any synced/distributed object in Modal.
@@ -51,6 +61,8 @@ class Handle(metaclass=ObjectMeta):
         if len(parts) != 2:
             raise InvalidError(f"Object id {object_id} has no dash in it")
         prefix = parts[0]
+        if prefix not in ObjectMeta.prefix_to_type:
+            _import_handle_types()
         if prefix not in ObjectMeta.prefix_to_type:
             raise InvalidError(f"Object prefix {prefix} does not correspond to a type")
         object_cls = ObjectMeta.prefix_to_type[prefix]
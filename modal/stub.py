@@ -47,8 +47,7 @@ class StubRunMode(Enum):
     SERVE = "serve"
 
 
-async def _heartbeat(client, app_id):
-    request = api_pb2.AppHeartbeatRequest(app_id=app_id)
+async def _heartbeat(client, request: api_pb2.AppHeartbeatRequest):
     # TODO(erikbern): we should capture exceptions here
     # * if request fails: destroy the client
     # * if server says the app is gone: print a helpful warning about detaching
@@ -100,7 +99,7 @@ class _Stub:
     _function_handles: Dict[str, _FunctionHandle]
     _web_endpoints: List[str]  # Used by the CLI
     _local_entrypoints: Dict[str, Callable]
-    _local_mounts: List[_Mount]
+    _local_mounts: Dict[str, _Mount]  # keyed by local uuid, since mounts are shared between functions
     _app: Optional[_App]
 
     def __init__(
@@ -125,7 +124,7 @@ class _Stub:
         self._secrets = secrets
         self._function_handles = {}
         self._local_entrypoints = {}
-        self._local_mounts = []
+        self._local_mounts = {}
         self._web_endpoints = []
 
         self._app = None
@@ -239,7 +238,8 @@ class _Stub:
         # Start tracking logs and yield context
         async with TaskContext(grace=config["logs_timeout"]) as tc:
             # Start heartbeats loop to keep the client alive
-            tc.infinite_loop(lambda: _heartbeat(client, app.app_id), sleep=HEARTBEAT_INTERVAL)
+            heartbeat_request = api_pb2.AppHeartbeatRequest(app_id=app.app_id)
+            tc.infinite_loop(lambda: _heartbeat(client, heartbeat_request), sleep=HEARTBEAT_INTERVAL)
 
             status_spinner = step_progress("Running app...")
             with output_mgr.ctx_if_visible(output_mgr.make_live(step_progress("Initializing..."))):
@@ -374,7 +374,7 @@ class _Stub:
                 async with self._run(client, output_mgr, None, mode=StubRunMode.SERVE) as app:
                     client.set_pre_stop(app.disconnect)
                     existing_app_id = app.app_id
-                    async for _ in watch(self._local_mounts, output_mgr, timeout):
+                    async for _ in watch(list(self._local_mounts.values()), output_mgr, timeout):
                         output_mgr.print_if_visible(
                             "Live-reload skipped. This feature is unsupported below Python 3.8."
                             " Upgrade to Python 3.8+ to enable live-reloading."
@@ -388,7 +388,7 @@ class _Stub:
 
                 curr_proc = None
                 try:
-                    async for _ in watch(self._local_mounts, output_mgr, timeout):
+                    async for _ in watch(list(self._local_mounts.values()), output_mgr, timeout):
                         curr_proc = await restart_serve(
                             existing_app_id=app.app_id, prev_proc=curr_proc, output_mgr=output_mgr
                         )
@@ -536,7 +536,7 @@ class _Stub:
         # Track all mounts. This is needed for file watching
         for mount in mounts:
             if mount.is_local():
-                self._local_mounts.append(mount)
+                self._local_mounts[mount.local_uuid] = mount
 
     @property
     def registered_functions(self) -> List[str]:
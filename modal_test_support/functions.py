@@ -33,6 +33,11 @@ def raises(x):
     raise Exception("Failure!")
 
 
+@stub.function
+def raises_with_payload(n):
+    raise Exception("x" * n)
+
+
 @stub.function
 def raises_sysexit(x):
     raise SystemExit(1)
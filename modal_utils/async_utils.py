@@ -3,8 +3,9 @@ import asyncio
 import concurrent.futures
 import functools
 import inspect
+import random
 import time
-from typing import Any, Awaitable, Callable, List, Optional, Set, TypeVar
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple, Type, TypeVar
 from typing_extensions import ParamSpec
 
 import synchronicity
@@ -47,11 +48,30 @@ def synchronize_apis(obj):
     )
 
 
-def retry(direct_fn=None, *, n_attempts=3, base_delay=0, delay_factor=2, timeout=90):
+# Sleeps between retries. Separate from asyncio.sleep, so tests can patch it without affecting the whole event loop.
+_retry_sleep = asyncio.sleep
+
+
+def retry(
+    direct_fn=None,
+    *,
+    n_attempts=3,
+    base_delay=0,
+    delay_factor=2,
+    max_delay=30.0,
+    jitter=0.5,
+    timeout=90,
+    retry_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+):
     """Decorator that calls an async function multiple times, with a given timeout.
 
     If a `base_delay` is provided, the function is given an exponentially
     increasing delay on each run, up until the maximum number of attempts.
+    The delay is capped at `max_delay`, and randomized by up to `jitter` (as a
+    fraction of the delay) so that many callers failing at once don't retry in lockstep.
+
+    Only exceptions that are instances of `retry_exceptions` are retried, anything else
+    is raised right away. Callers should narrow this down to errors that can be transient.
 
     Usage:
 
@@ -71,7 +91,6 @@ def retry(direct_fn=None, *, n_attempts=3, base_delay=0, delay_factor=2, timeout
     def decorator(fn):
         @functools.wraps(fn)
         async def f_wrapped(*args, **kwargs):
-            delay = base_delay
             for i in range(n_attempts):
                 t0 = time.time()
                 try:
@@ -79,16 +98,16 @@ def retry(direct_fn=None, *, n_attempts=3, base_delay=0, delay_factor=2, timeout
                 except asyncio.CancelledError:
                     logger.debug(f"Function {fn} was cancelled")
                     raise
-                except Exception as e:
+                except retry_exceptions as e:
                     if i >= n_attempts - 1:
                         raise
+                    delay = min(max_delay, base_delay * delay_factor**i) * (1 + random.uniform(-jitter, jitter))
                     logger.exception(
                         f"Failed invoking function {fn}: {e}"
                         f" (took {time.time() - t0}s, sleeping {delay}s"
                         f" and trying {n_attempts - i - 1} more times)"
                     )
-                await asyncio.sleep(delay)
-                delay *= delay_factor
+                await _retry_sleep(delay)
 
         return f_wrapped
 
@@ -100,6 +119,10 @@ def retry(direct_fn=None, *, n_attempts=3, base_delay=0, delay_factor=2, timeout
         return decorator
 
 
+# How long TaskContext waits for its tasks to exit after cancelling them
+CANCELLATION_TIMEOUT = 1.0
+
+
 class TaskContext:
     """Simple thing to make sure we don't have stray tasks.
 
@@ -127,47 +150,38 @@ class TaskContext:
         self._exited.set()
         await asyncio.sleep(0)  # Causes any just-created tasks to get started
         unfinished_tasks = [t for t in self._tasks if not t.done()]
-        gather_future = None
         try:
             if self._grace is not None and unfinished_tasks:
-                gather_future = asyncio.gather(*unfinished_tasks, return_exceptions=True)
-                await asyncio.wait_for(gather_future, timeout=self._grace)
-        except asyncio.TimeoutError:
-            pass
+                # Give the tasks some time to finish. Loops still running after that get cancelled too.
+                await asyncio.wait(unfinished_tasks, timeout=self._grace)
         finally:
-            # asyncio.wait_for cancels the future, but the CancelledError
-            # still needs to be handled
-            # (https://stackoverflow.com/a/63356323/2475114)
-            if gather_future:
-                try:
-                    await gather_future
-                # pre Python3.8, CancelledErrors were a subclass of exception
-                except asyncio.CancelledError:
-                    pass
-
-            for task in self._tasks:
-                if task.done() and not task.cancelled():
+            # Cancel all remaining tasks in one pass, then reap them together
+            done_tasks = [task for task in self._tasks if task.done()]
+            to_cancel = [
+                task for task in self._tasks if not task.done() and (self._grace is not None or task not in self._loops)
+            ]
+            for task in to_cancel:
+                logger.warning(f"Canceling remaining unfinished task {task}")
+                task.cancel()
+            if to_cancel:
+                # Don't hang on tasks that ignore the cancellation
+                reaped_tasks, _ = await asyncio.wait(to_cancel, timeout=CANCELLATION_TIMEOUT)
+                for task in reaped_tasks:
+                    if not task.cancelled():
+                        task.exception()  # Retrieve, so that it doesn't get logged as never retrieved
+
+            for task in done_tasks:
+                if not task.cancelled():
                     # Raise any exceptions if they happened.
                     # Only tasks without a done_callback will still be present in self._tasks
                     task.result()
 
-                if task.done() or task in self._loops:
-                    continue
-
-                logger.warning(f"Canceling remaining unfinished task {task}")
-                task.cancel()
-
     async def __aexit__(self, exc_type, value, tb):
         await self.stop()
 
     def create_task(self, coro_or_task) -> asyncio.Task:
-        if isinstance(coro_or_task, asyncio.Task):
-            task = coro_or_task
-        elif asyncio.iscoroutine(coro_or_task):
-            loop = asyncio.get_event_loop()
-            task = loop.create_task(coro_or_task)
-        else:
-            raise Exception(f"Object of type {type(coro_or_task)} is not a coroutine or Task")
+        # Returns tasks (and other futures) as is, and schedules coroutines and other awaitables as tasks
+        task = asyncio.ensure_future(coro_or_task)
         self._tasks.add(task)
         task.add_done_callback(self._tasks.discard)
         return task
@@ -177,23 +191,27 @@ class TaskContext:
 
         async def loop_coro() -> None:
             logger.debug(f"Starting infinite loop {function_name}")
-            while True:
-                t0 = time.time()
-                try:
-                    await asyncio.wait_for(async_f(), timeout=timeout)
-                    # pre Python3.8, CancelledErrors were a subclass of exception
-                except asyncio.CancelledError:
-                    raise
-                except Exception:
-                    time_elapsed = time.time() - t0
-                    logger.exception(f"Loop attempt failed for {function_name} (time_elapsed={time_elapsed})")
-                try:
-                    await asyncio.wait_for(self._exited.wait(), timeout=sleep)
-                except asyncio.TimeoutError:
-                    continue
-                # Only reached if self._exited got set.
-                logger.debug(f"Exiting infinite loop for {function_name}")
-                break
+            # Shared by all iterations, rather than wrapping a new wait() in wait_for every time we sleep
+            exited = asyncio.ensure_future(self._exited.wait())
+            try:
+                while True:
+                    t0 = time.time()
+                    try:
+                        await asyncio.wait_for(async_f(), timeout=timeout)
+                        # pre Python3.8, CancelledErrors were a subclass of exception
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        time_elapsed = time.time() - t0
+                        logger.exception(f"Loop attempt failed for {function_name} (time_elapsed={time_elapsed})")
+                    done, _ = await asyncio.wait([exited], timeout=sleep)
+                    if not done:
+                        continue
+                    # Only reached if self._exited got set.
+                    logger.debug(f"Exiting infinite loop for {function_name}")
+                    break
+            finally:
+                exited.cancel()
 
         t = self.create_task(loop_coro())
         if hasattr(t, "set_name"):  # Was added in Python 3.8:
@@ -207,24 +225,39 @@ class TaskContext:
         # This is slightly different than asyncio.wait since the `tasks` argument
         # may be a subset of all the tasks.
         # If any of the task context's task raises, throw that exception
-        # This is probably O(n^2) sadly but I guess it's fine
-        unfinished_tasks = set(tasks)
-        while True:
-            unfinished_tasks &= self._tasks
-            if not unfinished_tasks:
-                break
-            try:
-                done, pending = await asyncio.wait_for(
-                    asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED), timeout=30.0
-                )
-            except asyncio.TimeoutError:
-                continue
-            for task in done:
-                task.result()  # Raise exception if needed
-                if task in unfinished_tasks:
-                    unfinished_tasks.remove(task)
-                if task in self._tasks:
-                    self._tasks.remove(task)
+        # Rather than re-waiting on all the tasks every time one of them finishes, this
+        # registers a callback once per task that resolves a single future.
+        unfinished_tasks = set(tasks) & self._tasks
+        if not unfinished_tasks:
+            return
+
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        def on_done(task: asyncio.Task):
+            unfinished_tasks.discard(task)
+            if waiter.done():
+                return
+            if task.cancelled() or task.exception() is not None:
+                waiter.set_result(task)
+            elif not unfinished_tasks:
+                waiter.set_result(None)
+
+        watched_tasks = list(self._tasks)
+        for task in watched_tasks:
+            task.add_done_callback(on_done)
+        try:
+            failed_task = await waiter
+        finally:
+            for task in watched_tasks:
+                task.remove_done_callback(on_done)
+
+        if failed_task is not None:
+            failed_task.result()  # Raise exception
+
+
+# Reused across calls to run_coro_blocking, rather than starting a new thread every time.
+# The executor only starts its thread on the first submit, and concurrent.futures joins it on interpreter exit.
+_blocking_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="modal-blocking")
 
 
 def run_coro_blocking(coro):
@@ -233,35 +266,46 @@ def run_coro_blocking(coro):
     It's basically works like asyncio.run but unlike asyncio.run it also works
     with in the case an event loop is already running. It does this by basically
     moving the whole thing to a separate thread.
+
+    Note that calls are serialized on a single thread, so `coro` must not itself
+    call `run_coro_blocking`.
     """
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        fut = executor.submit(asyncio.run, coro)
-        return fut.result()
+    fut = _blocking_executor.submit(asyncio.run, coro)
+    return fut.result()
 
 
 async def queue_batch_iterator(q: asyncio.Queue, max_batch_size=100, debounce_time=0.015):
     """
     Read from a queue but return lists of items when queue is large
+
+    Treats a None value as end of queue items
     """
     item_list: List[Any] = []
 
     while True:
-        if q.empty() and len(item_list) > 0:
-            yield item_list
-            item_list = []
-            await asyncio.sleep(debounce_time)
-
         res = await q.get()
 
-        if len(item_list) >= max_batch_size:
-            yield item_list
-            item_list = []
+        # Drain the items that are already in the queue without going through the event loop
+        while res is not None:
+            item_list.append(res)
+            if len(item_list) >= max_batch_size:
+                yield item_list
+                item_list = []
+            try:
+                res = q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
 
         if res is None:
             if len(item_list) > 0:
                 yield item_list
             break
-        item_list.append(res)
+
+        if len(item_list) > 0:
+            # The queue is empty, so send what we have and give it some time to fill up again
+            yield item_list
+            item_list = []
+            await asyncio.sleep(debounce_time)
 
 
 class _WarnIfGeneratorIsNotConsumed:
@@ -17,6 +17,7 @@ from typing import (
     cast,
 )
 
+import grpclib.config
 import grpclib.events
 from grpclib import GRPCError, Status
 from grpclib.client import Channel, UnaryStreamMethod
@@ -119,6 +120,11 @@ class ChannelPool(Channel):
 _SendType = TypeVar("_SendType")
 _RecvType = TypeVar("_RecvType")
 
+# Larger than grpclib's default HTTP/2 flow control windows (4 MiB). These only apply to data we receive,
+# so that large responses (e.g. FunctionGetInputs with inline arguments, or streamed logs) over high-latency
+# connections aren't throttled waiting for window updates. Outbound requests are limited by the server's windows.
+HTTP2_WINDOW_SIZE = 8 * 1024 * 1024
+
 RETRYABLE_GRPC_STATUS_CODES = [
     Status.DEADLINE_EXCEEDED,
     Status.UNAVAILABLE,
@@ -149,9 +155,14 @@ def create_channel(
     else:
         channel_cls = Channel
 
+    config = grpclib.config.Configuration(
+        http2_connection_window_size=HTTP2_WINDOW_SIZE,
+        http2_stream_window_size=HTTP2_WINDOW_SIZE,
+    )
+
     channel: Channel
     if o.scheme == "unix":
-        channel = channel_cls(path=o.path)  # probably pointless to use a pool ever
+        channel = channel_cls(path=o.path, config=config)  # probably pointless to use a pool ever
     elif o.scheme in ("http", "https"):
         target = o.netloc
         parts = target.split(":")
@@ -159,7 +170,7 @@ def create_channel(
         ssl = o.scheme.endswith("s")
         host = parts[0]
         port = int(parts[1]) if len(parts) == 2 else 443 if ssl else 80
-        channel = channel_cls(host, port, ssl=ssl)
+        channel = channel_cls(host, port, ssl=ssl, config=config)
     else:
         raise Exception(f"Unknown scheme: {o.scheme}")
 